@@ -5,11 +5,12 @@ Ask-MCP - 基于FastMCP的实现
 """
 
 import asyncio
-import threading
 from typing import Optional
 from fastmcp import FastMCP
 from question_parser import QuestionParser, ParsedQuestion
-from ui_handler import UIHandler
+
+# 注意：ui_handler在首次弹窗时才导入——它会加载PyQt5（映射几十MB的动态库），
+# 服务器启动和从未提问的会话不必支付这笔开销
 
 
 # 创建FastMCP服务器实例
@@ -20,7 +21,6 @@ mcp = FastMCP(
 
 # 初始化组件
 question_parser = QuestionParser()
-ui_handler = UIHandler()
 
 
 @mcp.tool()
@@ -71,28 +71,25 @@ def ask_user_question(question_xml: str) -> str:
         if not question_parser.validate_question(question):
             return f"❌ 问题数据验证失败，请检查问题内容是否完整。\n\n解析结果:\n- 类型: {question.question_type}\n- 标题: {question.title}\n- 内容: {question.content}\n- 选项数量: {len(question.options) if question.options else 0}"
         
-        # 在新线程中显示对话框（避免阻塞）
+        # 按需导入UI模块（见模块头注释）
+        from ui_handler import UIHandler, DialogStatus
+
+        # 直接调用即可：show_question内部把对话框转发到常驻UI线程并阻塞等结果，
+        # 这里再包一层每次新建的线程只会增加开销，不会减少任何阻塞
         result_container = {"answer": None, "error": None, "cancelled": False}
-        
-        def show_dialog():
-            try:
-                answer = ui_handler.show_question(question)
-                if answer is None:
-                    result_container["error"] = "[THREAD]线程中收到None结果，这不应该发生"
-                elif isinstance(answer, str) and answer.startswith("CANCELLED:"):
-                    result_container["cancelled"] = True
-                    result_container["cancel_reason"] = answer.replace("CANCELLED:", "")
-                elif isinstance(answer, str) and answer.startswith("ERROR:"):
-                    result_container["error"] = answer.replace("ERROR:", "")
-                else:
-                    result_container["answer"] = answer
-            except Exception as e:
-                result_container["error"] = f"[THREAD]线程异常: {str(e)}"
-        
-        # 创建并启动线程
-        dialog_thread = threading.Thread(target=show_dialog)
-        dialog_thread.start()
-        dialog_thread.join()  # 等待用户回答
+
+        try:
+            # show_question返回结构化的DialogResult，直接按状态枚举分支
+            result = UIHandler.show_question(question)
+            if result.status is DialogStatus.CANCELLED:
+                result_container["cancelled"] = True
+                result_container["cancel_reason"] = result.reason
+            elif result.status is DialogStatus.ERROR:
+                result_container["error"] = result.reason
+            else:
+                result_container["answer"] = result.payload
+        except Exception as e:
+            result_container["error"] = f"[UI]显示对话框异常: {str(e)}"
         
         # 检查是否有错误
         if result_container["error"]:
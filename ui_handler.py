@@ -6,16 +6,232 @@
 """
 
 import sys
+import os
 import base64
-import json
+import functools
+import html
 import mimetypes
-from typing import Optional, Dict, Any
-from PyQt5.QtWidgets import (QApplication, QWidget, QVBoxLayout, QHBoxLayout, 
-                           QLabel, QPushButton, QTextEdit, QRadioButton, 
-                           QLineEdit, QButtonGroup, QFrame, QScrollArea, QGraphicsDropShadowEffect)
-from PyQt5.QtCore import Qt, QTimer, pyqtSignal, QPropertyAnimation, QEasingCurve, QRect, QSize, QMimeData
-from PyQt5.QtGui import QFont, QPalette, QColor, QLinearGradient, QPainter, QPen, QBrush, QPixmap, QClipboard
-from question_parser import ParsedQuestion, QuestionOption
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Optional, Any
+from PyQt5.QtWidgets import (QApplication, QWidget, QVBoxLayout, QHBoxLayout,
+                           QLabel, QPushButton, QTextEdit, QTextBrowser, QRadioButton,
+                           QButtonGroup, QFrame, QScrollArea, qDrawBorderPixmap)
+from PyQt5.QtCore import (Qt, QTimer, pyqtSignal, QPropertyAnimation, QEasingCurve,
+                          QPoint, QMargins, QUrl, QBuffer, QIODevice,
+                          QSignalBlocker, QEventLoop)
+from PyQt5.QtGui import (QColor, QPainter, QPixmap, QImage, QTextDocument, QTextCursor)
+from question_parser import ParsedQuestion
+
+# 优先使用pybase64的SIMD编码器（大图片时比标准库快数倍），未安装时回退到标准库
+try:
+    import pybase64
+    _b64encode = pybase64.b64encode_as_string
+except ImportError:
+    def _b64encode(data):
+        return base64.b64encode(data).decode('utf-8')
+
+
+# 常见图片扩展名的快速路径，避免每次拖拽事件都查询mimetypes数据库
+_IMG_EXTS = frozenset({'.png', '.jpg', '.jpeg', '.gif', '.bmp', '.webp', '.tiff', '.ico'})
+
+# 选择题选项的emoji图标（模块级常量，避免每次构建对话框时重新分配列表）
+_OPTION_EMOJI = ("🔹", "🔸", "⭐", "🎯", "🌟", "💎", "🎪", "🎨", "🎭", "🎪")
+
+# 选择题选项行每批同步构建的数量（超出部分分批推迟到首帧之后）
+_OPTION_BATCH = 24
+
+
+# 已经打印过错误的事件处理器名称，避免60Hz事件路径上的日志刷屏
+_logged_events = set()
+
+
+def _log_once(name, error):
+    """同一事件处理器的错误只打印一次"""
+    if name not in _logged_events:
+        _logged_events.add(name)
+        print(f"{name} 处理失败: {error}")
+
+
+def _safe_event(fn):
+    """Qt事件处理器的异常保护装饰器（防止闪退）。
+    try/except只在此处安装一次，被装饰的热路径方法本身保持精简。"""
+    @functools.wraps(fn)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return fn(self, *args, **kwargs)
+        except Exception as e:
+            _log_once(fn.__qualname__, e)
+    return wrapper
+
+
+@functools.lru_cache(maxsize=256)
+def _ext_is_image(ext):
+    """判断扩展名是否为图片类型（按扩展名缓存mimetypes查询结果）"""
+    mime_type, _ = mimetypes.guess_type('x' + ext)
+    return bool(mime_type and mime_type.startswith('image/'))
+
+
+def _is_image_file(file_path):
+    """检查路径是否指向图片文件"""
+    ext = os.path.splitext(file_path)[1].lower()
+    return ext in _IMG_EXTS or _ext_is_image(ext)
+
+
+def _scale_pixmap(pixmap, max_width, max_height):
+    """两段式缩放：远超目标尺寸的图片先用快速变换粗缩到2倍目标，再做一次平滑缩放。
+    平滑（双线性）核只处理粗缩后的像素，大图（如手机照片）的计算量大幅下降，肉眼质量不变。"""
+    if pixmap.width() > 4 * max_width or pixmap.height() > 4 * max_height:
+        pixmap = pixmap.scaled(2 * max_width, 2 * max_height, Qt.KeepAspectRatio, Qt.FastTransformation)
+    return pixmap.scaled(max_width, max_height, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+
+
+def _scale_pixmap_to_height(pixmap, max_height):
+    """两段式等比缩放到指定高度，原理同_scale_pixmap"""
+    if pixmap.height() > 4 * max_height:
+        pixmap = pixmap.scaledToHeight(2 * max_height, Qt.FastTransformation)
+    return pixmap.scaledToHeight(max_height, Qt.SmoothTransformation)
+
+
+@functools.lru_cache(maxsize=32)
+def _image_thumbnail(file_path, mtime_ns, file_size, max_width, max_height):
+    """解码并缩放图片文件，返回(mime类型, 缩放后图片的PNG字节)，失败返回None。
+    以(路径, 修改时间, 大小)为键缓存：交互过程中重复拖入同一张截图时，
+    第二次起跳过解码、缩放和重编码。缓存值只含小的缩略图字节——原图最大
+    可达10MB，乘上32个槽位会让常驻进程白白囤住几百MB。max_width为None时
+    按高度等比缩放。"""
+    try:
+        with open(file_path, 'rb') as f:
+            image_data = f.read()
+    except Exception as e:
+        print(f"读取图片文件失败: {e}")
+        return None
+
+    if not image_data:
+        return None
+
+    pixmap = QPixmap()
+    if not pixmap.loadFromData(image_data):
+        return None
+
+    if max_width is None:
+        if pixmap.height() > max_height:
+            pixmap = _scale_pixmap_to_height(pixmap, max_height)
+    elif pixmap.width() > max_width or pixmap.height() > max_height:
+        pixmap = _scale_pixmap(pixmap, max_width, max_height)
+
+    # 保留原始格式，不做PNG转码，避免JPEG转PNG后负载膨胀
+    mime_type, _ = mimetypes.guess_type(file_path)
+    if not mime_type or not mime_type.startswith('image/'):
+        mime_type = 'image/png'
+
+    # 缩放后的显示图以PNG字节缓存，重建QPixmap只需解码一张缩略图
+    # quality=100: Qt 5.13起映射为zlib级别0（不压缩），编码最快；临时UI粘贴体积略增可接受
+    buffer = QBuffer()
+    buffer.open(QIODevice.WriteOnly)
+    if not pixmap.save(buffer, "PNG", 100):
+        return None
+
+    return mime_type, bytes(buffer.data())
+
+
+def _load_image_file(file_path, mtime_ns, file_size, max_width, max_height):
+    """读取图片文件，返回(原始字节, mime类型, 缩放后图片的PNG字节)，失败返回None。
+    缩略图走_image_thumbnail的缓存；原始字节每次重新读盘——MCP负载只在
+    提交时用到它一次，热文件有操作系统页缓存兜底，不值得长期占着内存。"""
+    thumb = _image_thumbnail(file_path, mtime_ns, file_size, max_width, max_height)
+    if thumb is None:
+        return None
+
+    try:
+        with open(file_path, 'rb') as f:
+            image_data = f.read()
+    except Exception as e:
+        print(f"读取图片文件失败: {e}")
+        return None
+
+    if not image_data:
+        return None
+
+    mime_type, scaled_png = thumb
+    return image_data, mime_type, scaled_png
+
+
+def _premultiplied(image):
+    """转换为预乘alpha格式：文本渲染器每次绘制时不再逐像素预乘，动画/重绘期间更省带宽"""
+    return image.convertToFormat(QImage.Format_ARGB32_Premultiplied)
+
+
+def _encode_image_info(image_info):
+    """将内部存储的图片信息转换为MCP协议格式（必要时执行base64编码）"""
+    if "_bytes" in image_info:
+        return {
+            "type": "image",
+            "data": _b64encode(image_info["_bytes"]),
+            "mimeType": image_info["mimeType"]
+        }
+    return image_info
+
+
+def _live_image_names(document):
+    """收集文档中仍被引用的图片资源名称（用户粘贴后又删除的图片不在其中）。
+    必须遍历块内片段：allFormats()是文档的格式登记表，只增不减——被删除的
+    图片因undo栈仍引用其格式而留在表里，用它判断会把已删除的图片当作存活。"""
+    names = set()
+    block = document.begin()
+    while block.isValid():
+        it = block.begin()
+        while not it.atEnd():
+            fmt = it.fragment().charFormat()
+            if fmt.isImageFormat():
+                names.add(fmt.toImageFormat().name())
+            it += 1
+        block = block.next()
+    return names
+
+
+def _collect_content_with_images(text_edit):
+    """汇总文本编辑器的内容（MCP协议格式）。
+    base64编码推迟到此处执行，且只编码仍存在于文档中的图片——
+    粘贴后又被删除的图片不会产生编码开销，也不会进入回答。"""
+    text_content = text_edit.toPlainText()
+
+    if not text_edit.images:
+        return text_content
+
+    live_names = _live_image_names(text_edit.document())
+    images = [
+        _encode_image_info(info) for info in text_edit.images
+        if info.get("_name") is None or info["_name"] in live_names
+    ]
+
+    if not images:
+        return text_content
+
+    return {
+        "text": text_content,
+        "images": images
+    }
+
+
+def _header_html(title, content):
+    """构造头部浏览器的HTML。内容里的换行转成<br>：HTML会把\\n折叠成空格，
+    而走长内容分支（>256字符）的提示恰恰最可能是多段落的"""
+    content = html.escape(content).replace('\n', '<br>')
+    return (
+        f"<h3 align=center>{html.escape(title)}</h3>"
+        f"<p align=center>{content}</p>"
+    )
+
+
+def _content_is_empty(content):
+    """判断回答内容是否为空（纯文本或含图片的dict两种形态统一处理）"""
+    if isinstance(content, dict):
+        return not content.get("text", "").strip() and not content.get("images")
+    return not (content or "").strip()
 
 
 class ImageSupportedTextEdit(QTextEdit):
@@ -25,108 +241,109 @@ class ImageSupportedTextEdit(QTextEdit):
         super().__init__(parent)
         self.setAcceptDrops(True)
         self.images = []  # 存储图片数据，格式遵循MCP协议
-        
+        self._drag_cache = (None, False)  # (QMimeData的id, 检查结果)，同一次拖拽期间复用
+
     def canInsertFromMimeData(self, source):
         """检查是否可以插入MIME数据"""
         if source.hasImage() or source.hasUrls():
             return True
         return super().canInsertFromMimeData(source)
         
+    @_safe_event
     def insertFromMimeData(self, source):
         """处理MIME数据插入"""
-        try:
-            # 优先尝试处理图片数据
-            if source.hasImage():
-                image = source.imageData()
-                if image:
-                    self.insert_image(image)
-                    return
-                    
-            # 处理URL（包括文件路径）
-            if source.hasUrls():
-                for url in source.urls():
-                    if url.isLocalFile():
-                        file_path = url.toLocalFile()
-                        if self.is_image_file(file_path):
-                            self.insert_image_from_file(file_path)
-                            return
-            
-            # 处理文本中的图片路径（QQ等应用复制图片时的情况）
-            if source.hasText():
-                text = source.text().strip()
-                if text.startswith('file:///') and self.is_image_file(text.replace('file:///', '')):
-                    # 从文件路径加载图片
-                    file_path = text.replace('file:///', '').replace('/', '\\')
+        # 优先尝试处理图片数据
+        if source.hasImage():
+            image = source.imageData()
+            if image:
+                self.insert_image(image)
+                return
+
+        # 处理URL（包括文件路径）
+        if source.hasUrls():
+            for url in source.urls():
+                if url.isLocalFile():
+                    file_path = url.toLocalFile()
                     if self.is_image_file(file_path):
                         self.insert_image_from_file(file_path)
                         return
-                elif text.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.bmp', '.webp')):
-                    # 检查是否是图片文件路径
-                    if self.is_image_file(text):
-                        self.insert_image_from_file(text)
-                        return
-                            
-            super().insertFromMimeData(source)
-        except Exception as e:
-            print(f"处理粘贴数据时出错: {e}")
-            # 即使出错也要调用父类方法，避免完全失败
-            try:
-                super().insertFromMimeData(source)
-            except:
-                pass  # 忽略父类方法的错误
-        
+
+        # 处理文本中的图片路径（QQ等应用复制图片时的情况）
+        # 使用QUrl统一解析file://前缀，避免手工字符串替换（在POSIX上反斜杠替换会破坏路径）
+        if source.hasText():
+            text = source.text().strip()
+            url = QUrl(text)
+            file_path = url.toLocalFile() if url.isLocalFile() else text
+            if file_path and self.is_image_file(file_path):
+                self.insert_image_from_file(file_path)
+                return
+
+        super().insertFromMimeData(source)
+
+    @_safe_event
     def dragEnterEvent(self, event):
         """拖拽进入事件"""
-        if event.mimeData().hasImage() or self.has_image_urls(event.mimeData()):
+        mime_data = event.mimeData()
+        if mime_data.hasImage() or self.has_image_urls(mime_data):
             event.acceptProposedAction()
         else:
             super().dragEnterEvent(event)
-            
+
+    @_safe_event
     def dragMoveEvent(self, event):
         """拖拽移动事件"""
-        if event.mimeData().hasImage() or self.has_image_urls(event.mimeData()):
+        mime_data = event.mimeData()
+        if mime_data.hasImage() or self.has_image_urls(mime_data):
             event.acceptProposedAction()
         else:
             super().dragMoveEvent(event)
-            
+
+    @_safe_event
     def dropEvent(self, event):
         """拖拽放下事件"""
-        try:
-            if event.mimeData().hasImage():
-                self.insert_image(event.mimeData().imageData())
-                event.acceptProposedAction()
-            elif self.has_image_urls(event.mimeData()):
-                for url in event.mimeData().urls():
-                    if url.isLocalFile():
-                        file_path = url.toLocalFile()
-                        if self.is_image_file(file_path):
-                            self.insert_image_from_file(file_path)
-                            break
-                event.acceptProposedAction()
-            else:
-                super().dropEvent(event)
-        except Exception as e:
-            print(f"拖拽事件处理失败: {e}")
-            # 不抛出异常，避免闪退
-        
-    def has_image_urls(self, mime_data):
-        """检查是否包含图片URL"""
-        if mime_data.hasUrls():
+        mime_data = event.mimeData()
+        if mime_data.hasImage():
+            self.insert_image(mime_data.imageData())
+            event.acceptProposedAction()
+        elif self.has_image_urls(mime_data):
             for url in mime_data.urls():
                 if url.isLocalFile():
                     file_path = url.toLocalFile()
                     if self.is_image_file(file_path):
-                        return True
-        return False
-        
+                        self.insert_image_from_file(file_path)
+                        break
+            event.acceptProposedAction()
+        else:
+            super().dropEvent(event)
+        # 本次拖拽的QMimeData即将销毁，其id()会被后续对象复用，判定缓存必须随之失效
+        self._drag_cache = (None, False)
+
+    def dragLeaveEvent(self, event):
+        """拖拽离开事件：QMimeData生命周期结束，清掉按id()缓存的判定结果"""
+        self._drag_cache = (None, False)
+        super().dragLeaveEvent(event)
+
+    def has_image_urls(self, mime_data):
+        """检查是否包含图片URL（按QMimeData对象缓存——拖拽悬停期间Qt复用同一对象，
+        dragMoveEvent以约60Hz触发，缓存后重复调用为O(1)）"""
+        cache_key = id(mime_data)
+        if self._drag_cache[0] == cache_key:
+            return self._drag_cache[1]
+
+        result = False
+        if mime_data.hasUrls():
+            for url in mime_data.urls():
+                if url.isLocalFile() and self.is_image_file(url.toLocalFile()):
+                    result = True
+                    break
+
+        self._drag_cache = (cache_key, result)
+        return result
+
     def is_image_file(self, file_path):
         """检查是否为图片文件"""
-        try:
-            mime_type, _ = mimetypes.guess_type(file_path)
-            return mime_type and mime_type.startswith('image/')
-        except:
-            return False
-            
+        return _is_image_file(file_path)
+
     def insert_image(self, image):
         """插入图片（从QPixmap或QImage）"""
         try:
@@ -143,15 +360,15 @@ class ImageSupportedTextEdit(QTextEdit):
                 max_width = 300
                 max_height = 200
                 if pixmap.width() > max_width or pixmap.height() > max_height:
-                    pixmap = pixmap.scaled(max_width, max_height, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+                    pixmap = _scale_pixmap(pixmap, max_width, max_height)
                 
                 # 转换为字节数据
-                from PyQt5.QtCore import QBuffer, QIODevice
                 buffer = QBuffer()
                 buffer.open(QIODevice.WriteOnly)
                 
                 # 尝试保存为PNG格式
-                if not pixmap.save(buffer, "PNG"):
+                # quality=100: Qt 5.13起映射为zlib级别0（不压缩），编码最快；体积增幅被下游base64吸收
+                if not pixmap.save(buffer, "PNG", 100):
                     print("无法将图片保存为PNG格式")
                     return
                     
@@ -162,19 +379,25 @@ class ImageSupportedTextEdit(QTextEdit):
                     print("图片数据为空，跳过插入")
                     return
                 
-                # 按MCP协议格式存储
-                image_info = {
+                # 将已编码的PNG注册为文档资源，显示时直接复用，避免Qt再次编码/拷贝图片
+                resource_name = f"mcp://img/{len(self.images)}"
+                self.document().addResource(
+                    QTextDocument.ImageResource, QUrl(resource_name),
+                    _premultiplied(QImage.fromData(image_data, "PNG"))
+                )
+
+                # 按MCP协议格式存储（原始字节，base64编码推迟到提交时执行一次）
+                self.images.append({
                     "type": "image",
-                    "data": base64.b64encode(image_data).decode('utf-8'),
+                    "_bytes": bytes(image_data),
+                    "_name": resource_name,
                     "mimeType": "image/png"
-                }
-                
-                self.images.append(image_info)
-                
+                })
+
                 # 在文本编辑器中插入实际图片（不显示占位符）
                 cursor = self.textCursor()
-                cursor.insertImage(pixmap.toImage())
-                
+                cursor.insertImage(resource_name)
+
         except Exception as e:
             print(f"插入图片失败: {e}")
             # 不抛出异常，避免闪退
@@ -183,7 +406,6 @@ class ImageSupportedTextEdit(QTextEdit):
         """从文件插入图片"""
         try:
             # 处理文件路径格式
-            import os
             if file_path.startswith('file:///'):
                 file_path = file_path.replace('file:///', '')
             
@@ -196,54 +418,37 @@ class ImageSupportedTextEdit(QTextEdit):
                 return
             
             # 检查文件大小（避免加载过大的文件）
-            file_size = os.path.getsize(file_path)
-            if file_size > 10 * 1024 * 1024:  # 10MB限制
-                print(f"图片文件过大 ({file_size} bytes): {file_path}")
+            stat = os.stat(file_path)
+            if stat.st_size > 10 * 1024 * 1024:  # 10MB限制
+                print(f"图片文件过大 ({stat.st_size} bytes): {file_path}")
                 return
-            
-            # 加载图片并创建QPixmap
-            pixmap = QPixmap(file_path)
-            if pixmap.isNull():
+
+            # 经由缓存读取+解码+缩放：重复拖入同一文件时直接命中
+            cached = _load_image_file(file_path, stat.st_mtime_ns, stat.st_size, 300, 200)
+            if cached is None:
                 print(f"无法加载图片: {file_path}")
                 return
-                
-            # 缩放图片到合适大小
-            max_width = 300
-            max_height = 200
-            if pixmap.width() > max_width or pixmap.height() > max_height:
-                pixmap = pixmap.scaled(max_width, max_height, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                
-            # 读取原始文件数据用于MCP协议
-            try:
-                with open(file_path, 'rb') as f:
-                    image_data = f.read()
-            except Exception as e:
-                print(f"读取图片文件失败: {e}")
-                return
-                
-            # 检查数据是否有效
-            if not image_data or len(image_data) == 0:
-                print(f"图片文件数据为空: {file_path}")
-                return
-                
-            # 获取MIME类型
-            mime_type, _ = mimetypes.guess_type(file_path)
-            if not mime_type or not mime_type.startswith('image/'):
-                mime_type = 'image/png'
-                
-            # 按MCP协议格式存储
-            image_info = {
-                "type": "image", 
-                "data": base64.b64encode(image_data).decode('utf-8'),
+            image_data, mime_type, scaled_png = cached
+
+            # 将缩放后的图片注册为文档资源，提交时据此判断图片是否仍被引用
+            resource_name = f"mcp://img/{len(self.images)}"
+            self.document().addResource(
+                QTextDocument.ImageResource, QUrl(resource_name),
+                _premultiplied(QImage.fromData(scaled_png, "PNG"))
+            )
+
+            # 按MCP协议格式存储（原始字节，base64编码推迟到提交时执行一次）
+            self.images.append({
+                "type": "image",
+                "_bytes": image_data,
+                "_name": resource_name,
                 "mimeType": mime_type
-            }
-            
-            self.images.append(image_info)
-            
+            })
+
             # 在文本编辑器中插入实际图片（不显示占位符）
             cursor = self.textCursor()
-            cursor.insertImage(pixmap.toImage())
-            
+            cursor.insertImage(resource_name)
+
         except Exception as e:
             print(f"从文件插入图片失败: {e}")
             print(f"文件路径: {file_path}")
@@ -251,16 +456,7 @@ class ImageSupportedTextEdit(QTextEdit):
         
     def get_content_with_images(self):
         """获取包含图片的完整内容（MCP协议格式）"""
-        text_content = self.toPlainText()
-        
-        if not self.images:
-            return text_content
-            
-        # 返回包含文本和图片的结构化数据
-        return {
-            "text": text_content,
-            "images": self.images
-        }
+        return _collect_content_with_images(self)
 
 
 class AutoResizeTextEdit(QTextEdit):
@@ -270,8 +466,10 @@ class AutoResizeTextEdit(QTextEdit):
         super().__init__(parent)
         self.setAcceptDrops(True)
         self.images = []  # 存储图片数据，格式遵循MCP协议
+        self._drag_cache = (None, False)  # (QMimeData的id, 检查结果)，同一次拖拽期间复用
         self.is_single_line = is_single_line
         self._updating_height = False  # 防止高度更新时的递归调用
+        self._normalizing = False  # 防止单行规范化编辑递归触发textChanged
         
         # 基础设置
         self.setAcceptRichText(False)
@@ -289,6 +487,12 @@ class AutoResizeTextEdit(QTextEdit):
             self.setMinimumHeight(60)
             self.setMaximumHeight(300)
         
+        # 高度调整去抖定时器：将密集的内容变化（快速输入、整段粘贴）合并为每帧最多一次布局
+        self._resize_timer = QTimer(self)
+        self._resize_timer.setSingleShot(True)
+        self._resize_timer.setInterval(16)
+        self._resize_timer.timeout.connect(self._adjust_height_now)
+
         # 设置文档属性
         try:
             self.document().setDocumentMargin(8)
@@ -297,176 +501,173 @@ class AutoResizeTextEdit(QTextEdit):
             self.textChanged.connect(self._on_text_changed)
         except Exception as e:
             print(f"设置文档属性时出错: {e}")
-    
+
     def _adjust_height(self):
+        """请求调整高度（去抖，真正的布局在_adjust_height_now中执行）"""
+        self._resize_timer.start()
+
+    @_safe_event
+    def _adjust_height_now(self):
         """自动调整高度以适应内容"""
         if self._updating_height:
             return
-            
+
+        self._updating_height = True
         try:
-            self._updating_height = True
-            
             # 计算文档需要的高度
             doc_height = self.document().size().height()
             margins = self.contentsMargins()
             total_height = int(doc_height + margins.top() + margins.bottom() + 10)
-            
+
             # 限制高度范围
             min_height = self.minimumHeight()
             max_height = self.maximumHeight()
             new_height = max(min_height, min(max_height, total_height))
-            
+
             # 只有当高度确实需要改变时才调整
             if abs(self.height() - new_height) > 5:
                 self.setFixedHeight(new_height)
-                
-        except Exception as e:
-            print(f"调整高度时出错: {e}")
         finally:
             self._updating_height = False
     
+    @_safe_event
     def _on_text_changed(self):
         """处理文本变化"""
+        # 下面的每个光标编辑都会同步re-emit textChanged，不挡住重入的话
+        # 大段多行粘贴会按换行数递归（O(n²)甚至触顶递归限制），与
+        # _updating_height同样的标志位模式
+        if not self.is_single_line or self._normalizing:
+            return
+
+        self._normalizing = True
         try:
-            if self.is_single_line:
-                # 单行模式：限制文本长度并阻止换行
-                text = self.toPlainText()
-                if '\n' in text or '\r' in text:
-                    # 移除换行符
-                    clean_text = text.replace('\n', ' ').replace('\r', ' ')
-                    cursor = self.textCursor()
-                    cursor.select(cursor.Document)
-                    cursor.insertText(clean_text)
-                
-                # 限制文本长度
-                if len(text) > 500:
-                    cursor = self.textCursor()
-                    cursor.select(cursor.Document)
-                    cursor.insertText(text[:500])
-            
-            # 调整高度
-            self._adjust_height()
-            
-        except Exception as e:
-            print(f"处理文本变化时出错: {e}")
+            # 单行模式：限制文本长度并阻止换行。
+            # 只做针对性的光标编辑，不整篇重写文档（整篇重写会触发全量重排并丢失内联图片）
+            doc = self.document()
+
+            # 逐个删除块分隔符（即换行）并替换为空格，代价与换行数成正比
+            while doc.blockCount() > 1:
+                cursor = QTextCursor(doc.findBlockByNumber(0))
+                cursor.movePosition(QTextCursor.EndOfBlock)
+                cursor.deleteChar()
+                cursor.insertText(" ")
+
+            # 限制文本长度：只删除超出500字符的部分
+            if doc.characterCount() - 1 > 500:
+                cursor = QTextCursor(doc)
+                cursor.setPosition(500)
+                cursor.movePosition(QTextCursor.End, QTextCursor.KeepAnchor)
+                cursor.removeSelectedText()
+        finally:
+            self._normalizing = False
+
+        # 高度调整由contentsChanged信号统一触发（去抖），此处无需重复请求
     
+    @_safe_event
     def keyPressEvent(self, event):
         """处理键盘事件"""
-        try:
-            # 单行模式下阻止换行
-            if self.is_single_line and event.key() in (Qt.Key_Return, Qt.Key_Enter):
+        # 单行模式下阻止换行
+        if self.is_single_line and event.key() in (Qt.Key_Return, Qt.Key_Enter):
+            return
+
+        # 处理Ctrl+V粘贴图片
+        if event.key() == Qt.Key_V and event.modifiers() == Qt.ControlModifier:
+            clipboard = QApplication.clipboard()
+            mime_data = clipboard.mimeData()
+
+            if mime_data.hasImage():
+                self.insert_image(mime_data.imageData())
                 return
-                
-            # 处理Ctrl+V粘贴图片
-            if event.key() == Qt.Key_V and event.modifiers() == Qt.ControlModifier:
-                try:
-                    clipboard = QApplication.clipboard()
-                    mime_data = clipboard.mimeData()
-                    
-                    if mime_data.hasImage():
-                        self.insert_image(mime_data.imageData())
-                        return
-                    
-                    # 处理文件路径
-                    if mime_data.hasText():
-                        text = mime_data.text().strip()
-                        if self.is_image_file(text):
-                            self.insert_image_from_file(text)
-                            return
-                except Exception as e:
-                    print(f"处理粘贴事件时出错: {e}")
-                
-            super().keyPressEvent(event)
-        except Exception as e:
-            print(f"键盘事件处理失败: {e}")
-            try:
-                super().keyPressEvent(event)
-            except:
-                pass
-    
+
+            # 处理文件路径
+            if mime_data.hasText():
+                text = mime_data.text().strip()
+                if self.is_image_file(text):
+                    self.insert_image_from_file(text)
+                    return
+
+        super().keyPressEvent(event)
+
+    @_safe_event
     def insertFromMimeData(self, source):
         """处理MIME数据插入"""
-        try:
-            if source.hasImage():
-                self.insert_image(source.imageData())
-                return
-                
-            if source.hasUrls():
-                for url in source.urls():
-                    if url.isLocalFile():
-                        file_path = url.toLocalFile()
-                        if self.is_image_file(file_path):
-                            self.insert_image_from_file(file_path)
-                            return
-            
-            super().insertFromMimeData(source)
-        except Exception as e:
-            print(f"处理MIME数据时出错: {e}")
-            try:
-                super().insertFromMimeData(source)
-            except:
-                pass
-    
+        if source.hasImage():
+            self.insert_image(source.imageData())
+            return
+
+        if source.hasUrls():
+            for url in source.urls():
+                if url.isLocalFile():
+                    file_path = url.toLocalFile()
+                    if self.is_image_file(file_path):
+                        self.insert_image_from_file(file_path)
+                        return
+
+        super().insertFromMimeData(source)
+
+    @_safe_event
     def dragEnterEvent(self, event):
         """拖拽进入事件"""
-        try:
-            if event.mimeData().hasImage() or self.has_image_urls(event.mimeData()):
-                event.acceptProposedAction()
-            else:
-                super().dragEnterEvent(event)
-        except Exception as e:
-            print(f"拖拽进入事件处理失败: {e}")
-            
+        mime_data = event.mimeData()
+        if mime_data.hasImage() or self.has_image_urls(mime_data):
+            event.acceptProposedAction()
+        else:
+            super().dragEnterEvent(event)
+
+    @_safe_event
     def dragMoveEvent(self, event):
         """拖拽移动事件"""
-        try:
-            if event.mimeData().hasImage() or self.has_image_urls(event.mimeData()):
-                event.acceptProposedAction()
-            else:
-                super().dragMoveEvent(event)
-        except Exception as e:
-            print(f"拖拽移动事件处理失败: {e}")
-            
+        mime_data = event.mimeData()
+        if mime_data.hasImage() or self.has_image_urls(mime_data):
+            event.acceptProposedAction()
+        else:
+            super().dragMoveEvent(event)
+
+    @_safe_event
     def dropEvent(self, event):
         """拖拽放下事件"""
-        try:
-            if event.mimeData().hasImage():
-                self.insert_image(event.mimeData().imageData())
-                event.acceptProposedAction()
-            elif self.has_image_urls(event.mimeData()):
-                for url in event.mimeData().urls():
-                    if url.isLocalFile():
-                        file_path = url.toLocalFile()
-                        if self.is_image_file(file_path):
-                            self.insert_image_from_file(file_path)
-                            break
-                event.acceptProposedAction()
-            else:
-                super().dropEvent(event)
-        except Exception as e:
-            print(f"拖拽放下事件处理失败: {e}")
-    
+        mime_data = event.mimeData()
+        if mime_data.hasImage():
+            self.insert_image(mime_data.imageData())
+            event.acceptProposedAction()
+        elif self.has_image_urls(mime_data):
+            for url in mime_data.urls():
+                if url.isLocalFile():
+                    file_path = url.toLocalFile()
+                    if self.is_image_file(file_path):
+                        self.insert_image_from_file(file_path)
+                        break
+            event.acceptProposedAction()
+        else:
+            super().dropEvent(event)
+        # 本次拖拽的QMimeData即将销毁，其id()会被后续对象复用，判定缓存必须随之失效
+        self._drag_cache = (None, False)
+
+    def dragLeaveEvent(self, event):
+        """拖拽离开事件：QMimeData生命周期结束，清掉按id()缓存的判定结果"""
+        self._drag_cache = (None, False)
+        super().dragLeaveEvent(event)
+
     def has_image_urls(self, mime_data):
-        """检查是否包含图片URL"""
-        try:
-            if mime_data.hasUrls():
-                for url in mime_data.urls():
-                    if url.isLocalFile():
-                        file_path = url.toLocalFile()
-                        if self.is_image_file(file_path):
-                            return True
-        except:
-            pass
-        return False
+        """检查是否包含图片URL（按QMimeData对象缓存，同一次拖拽期间重复调用为O(1)）"""
+        cache_key = id(mime_data)
+        if self._drag_cache[0] == cache_key:
+            return self._drag_cache[1]
+
+        result = False
+        if mime_data.hasUrls():
+            for url in mime_data.urls():
+                if url.isLocalFile() and self.is_image_file(url.toLocalFile()):
+                    result = True
+                    break
+
+        self._drag_cache = (cache_key, result)
+        return result
         
     def is_image_file(self, file_path):
         """检查是否为图片文件"""
-        try:
-            mime_type, _ = mimetypes.guess_type(file_path)
-            return mime_type and mime_type.startswith('image/')
-        except:
-            return False
-            
+        return _is_image_file(file_path)
+
     def insert_image(self, image):
         """插入图片"""
         try:
@@ -483,26 +684,34 @@ class AutoResizeTextEdit(QTextEdit):
                     max_height = 100
                     
                 if pixmap.height() > max_height:
-                    pixmap = pixmap.scaledToHeight(max_height, Qt.SmoothTransformation)
+                    pixmap = _scale_pixmap_to_height(pixmap, max_height)
                 
                 # 保存图片数据
-                from PyQt5.QtCore import QBuffer, QIODevice
                 buffer = QBuffer()
                 buffer.open(QIODevice.WriteOnly)
                 
-                if pixmap.save(buffer, "PNG"):
+                # quality=100: Qt 5.13起映射为zlib级别0（不压缩），编码最快；体积增幅被下游base64吸收
+                if pixmap.save(buffer, "PNG", 100):
                     image_data = buffer.data()
                     if image_data:
-                        image_info = {
+                        # 注册为文档资源，提交时据此判断图片是否仍被引用
+                        resource_name = f"mcp://img/{len(self.images)}"
+                        self.document().addResource(
+                            QTextDocument.ImageResource, QUrl(resource_name),
+                            _premultiplied(pixmap.toImage())
+                        )
+
+                        # 原始字节存储，base64编码推迟到提交时执行一次
+                        self.images.append({
                             "type": "image",
-                            "data": base64.b64encode(image_data).decode('utf-8'),
+                            "_bytes": bytes(image_data),
+                            "_name": resource_name,
                             "mimeType": "image/png"
-                        }
-                        self.images.append(image_info)
-                        
+                        })
+
                         # 插入图片到文档
                         cursor = self.textCursor()
-                        cursor.insertImage(pixmap.toImage())
+                        cursor.insertImage(resource_name)
                         
         except Exception as e:
             print(f"插入图片失败: {e}")
@@ -510,8 +719,6 @@ class AutoResizeTextEdit(QTextEdit):
     def insert_image_from_file(self, file_path):
         """从文件插入图片"""
         try:
-            import os
-            
             if file_path.startswith('file:///'):
                 file_path = file_path.replace('file:///', '')
             
@@ -520,55 +727,42 @@ class AutoResizeTextEdit(QTextEdit):
             if not os.path.exists(file_path):
                 return
                 
-            file_size = os.path.getsize(file_path)
-            if file_size > 10 * 1024 * 1024:  # 10MB限制
+            stat = os.stat(file_path)
+            if stat.st_size > 10 * 1024 * 1024:  # 10MB限制
                 return
-            
-            pixmap = QPixmap(file_path)
-            if not pixmap.isNull():
-                # 调整图片大小
-                if self.is_single_line:
-                    max_height = 30
-                else:
-                    max_height = 200
-                    
-                if pixmap.height() > max_height:
-                    pixmap = pixmap.scaledToHeight(max_height, Qt.SmoothTransformation)
-                
-                # 读取原始文件数据
-                with open(file_path, 'rb') as f:
-                    image_data = f.read()
-                
-                if image_data:
-                    mime_type, _ = mimetypes.guess_type(file_path)
-                    if not mime_type or not mime_type.startswith('image/'):
-                        mime_type = 'image/png'
-                    
-                    image_info = {
-                        "type": "image",
-                        "data": base64.b64encode(image_data).decode('utf-8'),
-                        "mimeType": mime_type
-                    }
-                    self.images.append(image_info)
-                    
-                    # 插入图片到文档
-                    cursor = self.textCursor()
-                    cursor.insertImage(pixmap.toImage())
-                    
+
+            # 经由缓存读取+解码+缩放：重复拖入同一文件时直接命中
+            max_height = 30 if self.is_single_line else 200
+            cached = _load_image_file(file_path, stat.st_mtime_ns, stat.st_size, None, max_height)
+            if cached is None:
+                return
+            image_data, mime_type, scaled_png = cached
+
+            # 注册为文档资源，提交时据此判断图片是否仍被引用
+            resource_name = f"mcp://img/{len(self.images)}"
+            self.document().addResource(
+                QTextDocument.ImageResource, QUrl(resource_name),
+                _premultiplied(QImage.fromData(scaled_png, "PNG"))
+            )
+
+            # 原始字节存储，base64编码推迟到提交时执行一次
+            self.images.append({
+                "type": "image",
+                "_bytes": image_data,
+                "_name": resource_name,
+                "mimeType": mime_type
+            })
+
+            # 插入图片到文档
+            cursor = self.textCursor()
+            cursor.insertImage(resource_name)
+
         except Exception as e:
             print(f"从文件插入图片失败: {e}")
-    
+
     def get_content_with_images(self):
         """获取包含图片的完整内容（MCP协议格式）"""
-        text_content = self.toPlainText()
-        
-        if not self.images:
-            return text_content
-            
-        return {
-            "text": text_content,
-            "images": self.images
-        }
+        return _collect_content_with_images(self)
 
 
 # 保持向后兼容
@@ -579,49 +773,465 @@ class ImageSupportedLineEdit(AutoResizeTextEdit):
         super().__init__(parent, is_single_line=True)
 
 
-class ModernQuestionDialog(QWidget):
-    """现代化的问题对话框，支持自适应分辨率和美观效果"""
-    
-    finished = pyqtSignal(object)
-    
-    def __init__(self, question: ParsedQuestion):
-        super().__init__()
-        self.question = question
-        self.result = None  # 默认为None表示未完成
-        self.is_completed = False  # 新增：标记对话框是否已完成交互
-        self.cancel_reason = None  # 只有在明确取消时才设置
-        self.choice_group = None
-        self.custom_input = None
+@functools.lru_cache(maxsize=4)
+def _shadow_pixmap(margin, radius):
+    """预渲染圆角矩形阴影图（进程内每种尺寸只生成一次）。
+
+    用多层递减透明度的圆角矩形近似高斯模糊。相比QGraphicsDropShadowEffect，
+    阴影不再在每次重绘/动画帧时对整个子树做软件光栅化，重绘只剩一次贴图。"""
+    slice_edge = margin + radius
+    size = slice_edge * 2 + 2  # 中间留2px供九宫格拉伸
+    image = QImage(size, size, QImage.Format_ARGB32_Premultiplied)
+    image.fill(Qt.transparent)
+    painter = QPainter(image)
+    painter.setRenderHint(QPainter.Antialiasing)
+    painter.setPen(Qt.NoPen)
+    for i in range(margin, 0, -1):
+        # 越靠近内侧的层透明度越高，叠加后形成柔和的衰减
+        alpha = max(1, int(8 * ((margin - i + 1) / margin) ** 2))
+        painter.setBrush(QColor(0, 0, 0, alpha))
+        inset = margin - i
+        painter.drawRoundedRect(inset, inset, size - 2 * inset, size - 2 * inset,
+                                radius + i, radius + i)
+    painter.end()
+    return QPixmap.fromImage(image)
+
+
+# 对话框静态样式（颜色/渐变/边框等与DPI无关的规则）：整段只在QApplication上安装一次
+# 注意：如果以后在样式里引用图片（url(...)），必须走pyrcc5编译的Qt资源（url(:/...)），
+# 不要用文件路径——QStyleSheetStyle对文件路径的图片在每次sizeHint查询时都会重新stat/open
+_STATIC_CSS = """
+            /* 主容器 */
+            QFrame#mainContainer {
+                background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+                    stop:0 #667eea, stop:1 #764ba2);
+                border: 1px solid rgba(255, 255, 255, 0.2);
+            }
+
+            /* 字体基础设置 */
+            * {
+                font-family: 'Microsoft YaHei UI', 'Segoe UI', Arial, sans-serif;
+                color: white;
+            }
+
+            /* 头部区域 */
+            QFrame#headerFrame {
+                background: transparent;
+                border: none;
+            }
+
+            /* 标题样式 */
+            QLabel#titleLabel {
+                font-weight: bold;
+                color: white;
+                background: transparent;
+            }
+
+            /* 内容样式 */
+            QLabel#contentLabel {
+                color: rgba(255, 255, 255, 0.9);
+                background: transparent;
+            }
+
+            /* 长内容头部（QTextBrowser） */
+            QTextBrowser#headerBrowser {
+                background: transparent;
+                border: none;
+                color: white;
+            }
+
+            /* 错误标签 */
+            QLabel#errorLabel {
+                color: #ff6b6b;
+                background: rgba(255, 107, 107, 0.1);
+                border: 1px solid rgba(255, 107, 107, 0.3);
+            }
+
+            /* 输入框区域 */
+            QFrame#inputFrame {
+                background: transparent;
+                border: none;
+            }
+
+            /* 文本输入框 */
+            QTextEdit#modernTextEdit {
+                background: rgba(255, 255, 255, 0.95);
+                border: 2px solid rgba(255, 255, 255, 0.3);
+                color: #333;
+                selection-background-color: #667eea;
+            }
+
+            QTextEdit#modernTextEdit:focus {
+                border: 2px solid rgba(255, 255, 255, 0.8);
+                background: rgba(255, 255, 255, 1.0);
+            }
+
+            /* 滚动区域 */
+            QScrollArea#modernScrollArea {
+                background: transparent;
+                border: none;
+            }
+
+            QWidget#scrollWidget {
+                background: transparent;
+            }
+
+            QFrame#otherFrame {
+                background: rgba(255, 255, 255, 0.15);
+                border: 1px solid rgba(255, 255, 255, 0.3);
+            }
+
+            /* 单选按钮 */
+            QRadioButton#modernRadio {
+                color: white;
+                background: transparent;
+            }
+
+            /* 预设选项（单个QRadioButton直接呈现卡片样式，无需外层QFrame） */
+            QRadioButton#optionRadio {
+                color: white;
+                background: rgba(255, 255, 255, 0.1);
+                border: 1px solid rgba(255, 255, 255, 0.2);
+            }
+
+            QRadioButton#optionRadio:hover {
+                background: rgba(255, 255, 255, 0.2);
+                border: 1px solid rgba(255, 255, 255, 0.4);
+            }
+
+            QRadioButton#modernRadio::indicator:unchecked,
+            QRadioButton#optionRadio::indicator:unchecked {
+                border: 2px solid rgba(255, 255, 255, 0.6);
+                background: transparent;
+            }
+
+            QRadioButton#modernRadio::indicator:checked,
+            QRadioButton#optionRadio::indicator:checked {
+                border: 2px solid white;
+                background: qradialgradient(cx:0.5, cy:0.5, radius:0.5,
+                    fx:0.5, fy:0.5, stop:0 white, stop:0.3 white,
+                    stop:0.4 transparent, stop:1 transparent);
+            }
+
+            /* 自定义输入框（多行文本编辑器，未选中"其他"时的只读置灰态） */
+            QTextEdit#modernTextEdit[disabled_look="true"] {
+                background: rgba(255, 255, 255, 0.3);
+                color: rgba(255, 255, 255, 0.5);
+                border: 2px solid rgba(255, 255, 255, 0.2);
+            }
+
+            /* 按钮区域 */
+            QFrame#buttonFrame {
+                background: transparent;
+                border: none;
+            }
+
+            /* 取消按钮 */
+            QPushButton#cancelButton {
+                background: rgba(255, 255, 255, 0.2);
+                border: 1px solid rgba(255, 255, 255, 0.3);
+                color: white;
+                font-weight: bold;
+            }
+
+            QPushButton#cancelButton:hover {
+                background: rgba(255, 255, 255, 0.3);
+                border: 1px solid rgba(255, 255, 255, 0.5);
+            }
+
+            QPushButton#cancelButton:pressed {
+                background: rgba(255, 255, 255, 0.1);
+            }
+
+            /* 确定按钮 */
+            QPushButton#okButton {
+                background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+                    stop:0 #4facfe, stop:1 #00f2fe);
+                border: none;
+                color: white;
+                font-weight: bold;
+            }
+
+            QPushButton#okButton:hover {
+                background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+                    stop:0 #5fbbff, stop:1 #1ff3ff);
+            }
+
+            QPushButton#okButton:pressed {
+                background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+                    stop:0 #3f9bde, stop:1 #00d2de);
+            }
+
+            /* 滚动条样式 */
+            QScrollBar:vertical {
+                background: rgba(255, 255, 255, 0.1);
+                margin: 0;
+            }
+
+            QScrollBar::handle:vertical {
+                background: rgba(255, 255, 255, 0.3);
+            }
+
+            QScrollBar::handle:vertical:hover {
+                background: rgba(255, 255, 255, 0.5);
+            }
+
+            QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {
+                height: 0px;
+            }
+        """
+
+# 与DPI相关的小段尺寸规则模板：按缩放档位填充后装在对话框上，
+# 每个对话框要解析的CSS只剩这一小段
+_SIZE_TEMPLATE = """
+            QFrame#mainContainer {{
+                border-radius: {s16}px;
+            }}
+
+            QLabel#titleLabel {{
+                font-size: {s18}px;
+                padding: {s10}px;
+            }}
+
+            QLabel#contentLabel {{
+                font-size: {s14}px;
+                padding: {s5}px;
+            }}
+
+            QTextBrowser#headerBrowser {{
+                font-size: {s14}px;
+            }}
+
+            QLabel#errorLabel {{
+                border-radius: {s8}px;
+                padding: {s10}px;
+                font-size: {s13}px;
+            }}
+
+            QTextEdit#modernTextEdit {{
+                border-radius: {s12}px;
+                padding: {s15}px;
+                font-size: {s13}px;
+            }}
+
+            QFrame#otherFrame {{
+                border-radius: {s8}px;
+                margin: {s2}px;
+            }}
+
+            QRadioButton#modernRadio {{
+                font-size: {s13}px;
+                padding: {s5}px;
+                spacing: {s8}px;
+            }}
+
+            QRadioButton#optionRadio {{
+                font-size: {s13}px;
+                padding: {s8}px {s15}px;
+                spacing: {s8}px;
+                border-radius: {s8}px;
+                margin: {s2}px;
+            }}
+
+            QRadioButton#modernRadio::indicator,
+            QRadioButton#optionRadio::indicator {{
+                width: {s16}px;
+                height: {s16}px;
+            }}
+
+            QRadioButton#modernRadio::indicator:unchecked,
+            QRadioButton#optionRadio::indicator:unchecked {{
+                border-radius: {s8}px;
+            }}
+
+            QRadioButton#modernRadio::indicator:checked,
+            QRadioButton#optionRadio::indicator:checked {{
+                border-radius: {s8}px;
+            }}
+
+            QPushButton#cancelButton {{
+                border-radius: {s20}px;
+                font-size: {s13}px;
+            }}
+
+            QPushButton#okButton {{
+                border-radius: {s20}px;
+                font-size: {s13}px;
+            }}
+
+            QScrollBar:vertical {{
+                width: {s8}px;
+                border-radius: {s4}px;
+            }}
+
+            QScrollBar::handle:vertical {{
+                border-radius: {s4}px;
+                min-height: {s20}px;
+            }}
+        """
+
+
+@functools.lru_cache(maxsize=1)
+def _screen_info():
+    """缓存主屏几何信息和缩放因子。
+    QApplication.desktop()在多显示器系统上涉及平台层往返调用，
+    连续弹出多个问题时只查询一次。"""
+    geometry = QApplication.desktop().screenGeometry()
+
+    # 根据屏幕分辨率计算缩放因子（以1920x1080为基准）
+    width_scale = geometry.width() / 1920
+    height_scale = geometry.height() / 1080
+
+    # 使用较小的缩放因子，并限制在0.6到1.2之间，确保在小屏幕上也能完整显示
+    scale = max(0.6, min(1.2, min(width_scale, height_scale)))
+    return geometry, scale
+
+
+class ModernQuestionDialog(QWidget):
+    """现代化的问题对话框，支持自适应分辨率和美观效果"""
+
+    finished = pyqtSignal(object)
+
+    # 按问题结构签名缓存的可复用对话框实例：MCP会话里经常连续出现
+    # 同形态的问题，复用控件树后第二次起只需改写文本和复位状态
+    _instance_cache = {}
+
+    # 按缩放档位缓存的已格式化尺寸样式（key: round(scale_factor*100)）
+    _style_cache = {}
+    # 静态样式是否已安装到QApplication（整个进程只安装/解析一次）
+    _static_style_installed = False
+    
+    def __init__(self, question: ParsedQuestion):
+        super().__init__()
+        # 构建期间关闭更新：大量addWidget不再各自调度重绘，布局合并为一次
+        self.setUpdatesEnabled(False)
+        self.question = question
+        # 问题类型只判定一次：构建和提交路径用预解析的布尔/已绑定方法分发
+        self._is_qa = question.question_type == 'qa'
+        self._collect_answer = (self._collect_qa_answer if self._is_qa
+                                else self._collect_choice_answer)
+        self.result = None  # 默认为None表示未完成
+        self.is_completed = False  # 新增：标记对话框是否已完成交互
+        self.cancel_reason = None  # 只有在明确取消时才设置
+        self._finished_emitted = False  # 防止finished信号重复发射（close()会再次进入closeEvent）
+        self.choice_group = None
+        self.custom_input = None
         self.text_input = None
         self.error_label = None
         self.animation = None
+        self._pending_options = []
+        self._header_browser = None
+        self._title_label = None
+        self._content_label = None
 
         
-        # 获取屏幕信息以适应分辨率
-        self.screen = QApplication.desktop().screenGeometry()
-        self.scale_factor = self.get_scale_factor()
-        
+        # 获取屏幕信息以适应分辨率（模块级缓存，避免每个对话框都做平台查询）
+        self.screen, self.scale_factor = _screen_info()
+
+        # 界面构建路径反复使用的常量尺寸，预先缩放一次，构建时直接查表
+        self._scaled = {n: int(n * self.scale_factor)
+                        for n in (8, 12, 15, 20, 25, 30, 40, 60, 100, 150, 250, 400, 500)}
+
+        # 推迟到首次事件循环迭代（即show()之后）再接的非关键信号连接
+        self._pending_connects = []
+
+        # 复用的定时器：QTimer.singleShot每次都会新建QTimer+连接，
+        # 错误提示频繁闪现时成堆的QObject分配没有必要
+        self._error_hide_timer = QTimer(self)
+        self._error_hide_timer.setSingleShot(True)
+        self._error_hide_timer.timeout.connect(self._hide_error)
+        self._adjust_size_timer = QTimer(self)
+        self._adjust_size_timer.setSingleShot(True)
+        self._adjust_size_timer.timeout.connect(self.adjust_size_to_content)
+
         self.init_ui()
         self.setup_animations()
-        
-    def get_scale_factor(self):
-        """根据屏幕分辨率计算缩放因子"""
-        base_width = 1920
-        base_height = 1080
-        
-        # 计算基于宽度和高度的缩放因子
-        width_scale = self.screen.width() / base_width
-        height_scale = self.screen.height() / base_height
-        
-        # 使用较小的缩放因子，确保界面不会过大
-        scale = min(width_scale, height_scale)
-        
-        # 限制缩放范围在0.6到1.2之间，确保在小屏幕上也能完整显示
-        return max(0.6, min(1.2, scale))
-        
+
+        # 构建完成，恢复更新（窗口此时尚未显示，首帧会一次性绘制完整界面）
+        self.setUpdatesEnabled(True)
+
+        # connect()的QMetaObject查找开销可观，非关键连接批量推迟到首帧之后，
+        # 让对话框的首次绘制更早发生
+        if self._pending_connects:
+            QTimer.singleShot(0, self._flush_connects)
+
+    @classmethod
+    def acquire(cls, question: ParsedQuestion):
+        """获取承载该问题的对话框：结构相同的问题复用缓存实例，否则新建并缓存。
+
+        结构签名包含问题类型、选项数量和头部形态（长内容用QTextBrowser、
+        短内容用QLabel），保证复用时所有控件都能通过改写文本来适配。"""
+        key = (question.question_type,
+               len(question.options) if question.options else 0,
+               len(question.content or "") > 256,
+               bool(question.content))
+        dialog = cls._instance_cache.get(key)
+        if dialog is not None:
+            dialog.reset_for(question)
+            return dialog
+        dialog = cls(question)
+        cls._instance_cache[key] = dialog
+        return dialog
+
+    def reset_for(self, question: ParsedQuestion):
+        """用现有控件树承载同结构的新问题：只改文本并复位状态，不重建控件"""
+        self.question = question
+
+        # 头部文本
+        if self._header_browser is not None:
+            self._header_browser.setHtml(_header_html(question.title, question.content))
+            # 新内容的排版高度不同，重新按文档高度定高
+            self._fit_header_browser(self._header_browser)
+        else:
+            self._title_label.setText(question.title)
+            if self._content_label is not None:
+                self._content_label.setText(question.content)
+
+        if not self._is_qa:
+            # 上一个问题可能还有未分批建完的选项行，先同步补齐再改写文本
+            while self._pending_options:
+                self._build_more_options()
+            for i, option in enumerate(question.options):
+                emoji = _OPTION_EMOJI[i] if i < len(_OPTION_EMOJI) else "•"
+                self.choice_group.button(i).setText(f"{emoji} {option.text}")
+            self.choice_group.button(0).setChecked(True)
+            if self.custom_input is not None:
+                with QSignalBlocker(self.custom_input):
+                    self.custom_input.clear()
+                    self.custom_input.images.clear()
+                self._set_custom_input_active(False)
+        elif self.text_input is not None:
+            self.text_input.clear()
+            self.text_input.images.clear()
+
+        if self.error_label is not None:
+            self.error_label.setVisible(False)
+
+        # 交互状态复位
+        self.result = None
+        self.is_completed = False
+        self.cancel_reason = None
+        self._finished_emitted = False
+
+        self.adjust_size_to_content()
+
+    def _defer_connect(self, signal, slot):
+        """登记一个推迟到对话框显示后再建立的信号连接"""
+        self._pending_connects.append((signal, slot))
+
+    def _flush_connects(self):
+        """建立所有推迟的信号连接"""
+        pending, self._pending_connects = self._pending_connects, []
+        for signal, slot in pending:
+            signal.connect(slot)
+
     def scaled(self, value):
-        """根据缩放因子调整数值"""
-        return int(value * self.scale_factor)
+        """根据缩放因子调整数值（结果按输入值缓存，重复调用退化为一次字典查找）"""
+        cache = self._scaled
+        result = cache.get(value)
+        if result is None:
+            result = cache[value] = int(value * self.scale_factor)
+        return result
         
     def init_ui(self):
         """初始化现代化界面"""
@@ -631,12 +1241,12 @@ class ModernQuestionDialog(QWidget):
         self.setAttribute(Qt.WA_TranslucentBackground, True)
         
         # 初始设置一个基础大小
-        if self.question.question_type == 'choice':
-            base_width = 600
-            base_height = 600  # 增加初始高度以容纳"其他"选项
-        else:
+        if self._is_qa:
             base_width = 550
             base_height = 450
+        else:
+            base_width = 600
+            base_height = 600  # 增加初始高度以容纳"其他"选项
             
         # 应用缩放
         width = self.scaled(base_width)
@@ -649,25 +1259,17 @@ class ModernQuestionDialog(QWidget):
         width = min(width, max_width)
         height = min(height, max_height)
             
-        # 设置初始大小（之后会根据内容调整）
+        # 设置初始大小（仅作为布局参考宽度，最终尺寸在内容构建完成后一次性确定）
         self.resize(width, height)
-        
-        # 居中显示
-        self.center_window()
-        
-        # 创建主容器
+
+        # 窗口尚未显示且更新已挂起（见__init__），以下构建过程不会触发中间
+        # 绘制；布局也只在末尾的adjust_size_to_content里做一次最终测量
+        self.add_shadow_effect()
         self.setup_main_container()
-        
-        # 创建布局
         self.setup_layout()
-        
-        # 设置样式
         self.setup_styles()
-        
-        # 添加阴影效果
-        self.add_shadow_effect()
-        
-        # 根据内容调整最终大小
+
+        # 单次布局传递：读取内容sizeHint后一次性resize+居中，不再做多轮adjustSize
         self.adjust_size_to_content()
         
     def center_window(self):
@@ -685,20 +1287,17 @@ class ModernQuestionDialog(QWidget):
     def adjust_size_to_content(self):
         """根据内容调整对话框大小"""
         try:
-            # 让布局先计算所需的大小
-            self.main_container.adjustSize()
-            
-            # 获取内容所需的大小
+            # sizeHint已包含布局的尺寸计算，无需先adjustSize再读取（省一次布局传递）
             content_size = self.main_container.sizeHint()
-            
+
             # 添加一些边距
-            padding = self.scaled(60)  # 总边距
+            padding = self._scaled[60]  # 总边距
             needed_width = content_size.width() + padding
             needed_height = content_size.height() + padding
             
             # 限制最大和最小尺寸
-            min_width = self.scaled(500)
-            min_height = self.scaled(400)
+            min_width = self._scaled[500]
+            min_height = self._scaled[400]
             max_width = int(self.screen.width() * 0.9)
             max_height = int(self.screen.height() * 0.9)
             
@@ -709,39 +1308,41 @@ class ModernQuestionDialog(QWidget):
             # 只有当尺寸确实需要改变时才调整
             if abs(self.width() - final_width) > 10 or abs(self.height() - final_height) > 10:
                 self.resize(final_width, final_height)
-                self.center_window()  # 重新居中
-                
-                # 更新主容器大小
-                self.main_container.setGeometry(0, 0, self.width(), self.height())
-                
+
+                # 更新主容器大小（保留阴影边距）
+                m = self._shadow_margin
+                self.main_container.setGeometry(m, m, self.width() - 2 * m, self.height() - 2 * m)
+
+            # 居中必须无条件执行：内容尺寸与初始基准尺寸足够接近时不会走
+            # 上面的resize分支，但无边框窗口此时还停在窗口系统的默认位置
+            self.center_window()
+
         except Exception as e:
             print(f"调整对话框大小时出错: {e}")
         
     def setup_main_container(self):
-        """设置主容器"""
+        """设置主容器（四周留出阴影边距）"""
+        m = self._shadow_margin
         self.main_container = QFrame(self)
-        self.main_container.setGeometry(0, 0, self.width(), self.height())
+        self.main_container.setGeometry(m, m, self.width() - 2 * m, self.height() - 2 * m)
         self.main_container.setObjectName("mainContainer")
         
     def setup_layout(self):
         """设置现代化布局"""
         main_layout = QVBoxLayout(self.main_container)
-        main_layout.setSpacing(self.scaled(20))
-        main_layout.setContentsMargins(self.scaled(30), self.scaled(30), self.scaled(30), self.scaled(30))
+        main_layout.setSpacing(self._scaled[20])
+        main_layout.setContentsMargins(self._scaled[30], self._scaled[30], self._scaled[30], self._scaled[30])
         
         # 创建标题区域
         self.create_header(main_layout)
-        
-        # 错误信息标签
-        self.error_label = QLabel("")
-        self.error_label.setObjectName("errorLabel")
-        self.error_label.setVisible(False)
-        main_layout.addWidget(self.error_label)
-        
+
+        # 错误信息标签按需创建（见_ensure_error_label），多数对话框从不报错
+        self._main_layout = main_layout
+
         # 输入区域
-        if self.question.question_type == 'qa':
+        if self._is_qa:
             self.create_text_input(main_layout)
-        elif self.question.question_type == 'choice':
+        else:
             self.create_choice_input(main_layout)
         
         # 按钮区域
@@ -752,25 +1353,51 @@ class ModernQuestionDialog(QWidget):
         header_frame = QFrame()
         header_frame.setObjectName("headerFrame")
         header_layout = QVBoxLayout(header_frame)
-        header_layout.setSpacing(self.scaled(12))
-        
-        # 标题
-        title_label = QLabel(self.question.title)
-        title_label.setObjectName("titleLabel")
-        title_label.setWordWrap(True)
-        title_label.setAlignment(Qt.AlignCenter)
-        header_layout.addWidget(title_label)
-        
-        # 内容描述
-        if self.question.content:
-            content_label = QLabel(self.question.content)
-            content_label.setObjectName("contentLabel")
-            content_label.setWordWrap(True)
-            content_label.setAlignment(Qt.AlignCenter)
-            header_layout.addWidget(content_label)
-            
+        header_layout.setSpacing(self._scaled[12])
+
+        if len(self.question.content or "") > 256:
+            # 长内容走单个QTextBrowser：文档宽度固定后排版只运行一次，
+            # 避免两个自动换行QLabel在每次resize/sizeHint时的重复排版
+            browser = QTextBrowser()
+            browser.setObjectName("headerBrowser")
+            browser.setOpenExternalLinks(False)
+            browser.setFrameShape(QFrame.NoFrame)
+            browser.setHtml(_header_html(self.question.title, self.question.content))
+            doc_width = self.width() - 2 * self._scaled[30]
+            browser.setFixedWidth(doc_width)
+            browser.document().setTextWidth(doc_width)
+            self._fit_header_browser(browser)
+            header_layout.addWidget(browser)
+            self._header_browser = browser
+        else:
+            # 标题
+            title_label = QLabel(self.question.title)
+            title_label.setObjectName("titleLabel")
+            title_label.setWordWrap(True)
+            title_label.setAlignment(Qt.AlignCenter)
+            header_layout.addWidget(title_label)
+            self._title_label = title_label
+
+            # 内容描述
+            if self.question.content:
+                content_label = QLabel(self.question.content)
+                content_label.setObjectName("contentLabel")
+                content_label.setWordWrap(True)
+                content_label.setAlignment(Qt.AlignCenter)
+                header_layout.addWidget(content_label)
+                self._content_label = content_label
+
         layout.addWidget(header_frame)
-        
+
+    def _fit_header_browser(self, browser):
+        """按文档实际排版高度固定头部浏览器的高度。
+        QTextBrowser的sizeHint与内容无关（固定约256x192），不显式设高的话
+        adjust_size_to_content会按这个假值测量，长提示被压进一个小滚动框里。
+        超出屏幕预算时封顶，浏览器内部滚动条兜底。"""
+        doc_height = int(browser.document().size().height())
+        max_height = int(self.screen.height() * 0.5)
+        browser.setFixedHeight(min(doc_height + self._scaled[8], max_height))
+
     def create_text_input(self, layout):
         """创建现代化文本输入区域"""
         input_frame = QFrame()
@@ -781,7 +1408,7 @@ class ModernQuestionDialog(QWidget):
         self.text_input = ImageSupportedTextEdit()
         self.text_input.setObjectName("modernTextEdit")
         self.text_input.setPlaceholderText("💭 请在此输入您的回答...\n📎 支持拖拽图片或Ctrl+V粘贴图片")
-        self.text_input.setMaximumHeight(self.scaled(150))
+        self.text_input.setMaximumHeight(self._scaled[150])
         self.text_input.setAcceptRichText(False)
         
         input_layout.addWidget(self.text_input)
@@ -798,441 +1425,307 @@ class ModernQuestionDialog(QWidget):
         scroll_area = QScrollArea()
         scroll_area.setObjectName("modernScrollArea")
         scroll_area.setWidgetResizable(True)
-        scroll_area.setMaximumHeight(self.scaled(250))
+        scroll_area.setMaximumHeight(self._scaled[250])
         scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
         scroll_area.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
         
         scroll_widget = QWidget()
         scroll_widget.setObjectName("scrollWidget")
         scroll_layout = QVBoxLayout(scroll_widget)
-        scroll_layout.setSpacing(self.scaled(8))
-        
-        # 添加预设选项
-        for i, option in enumerate(self.question.options):
-            option_frame = QFrame()
-            option_frame.setObjectName("optionFrame")
-            option_layout = QHBoxLayout(option_frame)
-            option_layout.setContentsMargins(self.scaled(15), self.scaled(8), self.scaled(15), self.scaled(8))
-            
-            radio = QRadioButton(option.text)
-            radio.setObjectName("modernRadio")
-            radio.setAttribute(Qt.WA_Hover, True)
-            
-            # 添加emoji图标
-            emoji_icons = ["🔹", "🔸", "⭐", "🎯", "🌟", "💎", "🎪", "🎨", "🎭", "🎪"]
-            if i < len(emoji_icons):
-                radio.setText(f"{emoji_icons[i]} {option.text}")
-            
-            self.choice_group.addButton(radio, i)
-            option_layout.addWidget(radio)
-            scroll_layout.addWidget(option_frame)
-            
-            # 默认选择第一个
-            if i == 0:
-                radio.setChecked(True)
+        scroll_layout.setSpacing(self._scaled[8])
         
+        self._scroll_layout = scroll_layout
+
         # 添加"其他"选项
         other_frame = QFrame()
         other_frame.setObjectName("otherFrame")
         other_layout = QVBoxLayout(other_frame)
-        other_layout.setContentsMargins(self.scaled(15), self.scaled(8), self.scaled(15), self.scaled(8))
-        other_layout.setSpacing(self.scaled(8))
+        other_layout.setContentsMargins(self._scaled[15], self._scaled[8], self._scaled[15], self._scaled[8])
+        other_layout.setSpacing(self._scaled[8])
         
         other_radio = QRadioButton("✨ 其他")
         other_radio.setObjectName("modernRadio")
-        other_radio.setAttribute(Qt.WA_Hover, True)
         self.choice_group.addButton(other_radio, len(self.question.options))
         other_layout.addWidget(other_radio)
         
-        self.custom_input = AutoResizeTextEdit(is_single_line=False)
-        self.custom_input.setObjectName("modernTextEdit")
-        self.custom_input.setPlaceholderText("🖊️ 请输入自定义选项... 📎 支持拖拽或粘贴图片\n支持多行文本，窗口会自动适应内容高度")
-        self.custom_input.setEnabled(False)
-        other_layout.addWidget(self.custom_input)
-        
+        # 自定义输入框按需创建（见_ensure_custom_input），
+        # 用户不点"其他"就完全不用构建这个QTextEdit子树
+        self._other_layout = other_layout
+
         other_frame.setLayout(other_layout)
         scroll_layout.addWidget(other_frame)
-        
-        # 连接信号 - 使用安全的信号连接
-        try:
-            other_radio.toggled.connect(self.on_custom_toggled)
-            self.custom_input.textChanged.connect(self.on_custom_changed)
-        except Exception as e:
-            print(f"连接信号时出错: {e}")
-        
+
+        # 连接信号 - 推迟到显示后建立（用户来不及在首帧前操作这些控件）
+        self._defer_connect(other_radio.toggled, self.on_custom_toggled)
+
+        # 预设选项分批构建：滚动区同屏只放得下十来行，首屏只同步创建第一批，
+        # 剩余选项推迟到首帧之后分批补齐——构建成本随可见行数而不是总行数增长
+        options = list(enumerate(self.question.options))
+        self._pending_options = options[_OPTION_BATCH:]
+        for i, option in options[:_OPTION_BATCH]:
+            self._build_option_row(i, option)
+        if self._pending_options:
+            QTimer.singleShot(0, self._build_more_options)
+
         scroll_widget.setLayout(scroll_layout)
         scroll_area.setWidget(scroll_widget)
         layout.addWidget(scroll_area)
+
+    def _build_option_row(self, i, option):
+        """构建单个预设选项行（插在固定位于末尾的"其他"选项之前）。
+        卡片外观直接由QRadioButton的样式呈现，不再套QFrame+QHBoxLayout——
+        每个选项从3个Qt对象减为1个，几何管理的开销随之下降"""
+        emoji = _OPTION_EMOJI[i] if i < len(_OPTION_EMOJI) else "•"
+        radio = QRadioButton(f"{emoji} {option.text}")
+        radio.setObjectName("optionRadio")
+
+        self.choice_group.addButton(radio, i)
+        self._scroll_layout.insertWidget(self._scroll_layout.count() - 1, radio)
+
+        # 默认选择第一个
+        if i == 0:
+            radio.setChecked(True)
+
+    def _build_more_options(self):
+        """分批补齐剩余的选项行，每批之间让出事件循环保持界面响应"""
+        batch = self._pending_options[:_OPTION_BATCH]
+        del self._pending_options[:_OPTION_BATCH]
+        for i, option in batch:
+            self._build_option_row(i, option)
+        if self._pending_options:
+            QTimer.singleShot(0, self._build_more_options)
         
     def create_buttons(self, layout):
         """创建现代化按钮区域"""
         button_frame = QFrame()
         button_frame.setObjectName("buttonFrame")
         button_layout = QHBoxLayout(button_frame)
-        button_layout.setSpacing(self.scaled(15))
+        button_layout.setSpacing(self._scaled[15])
         button_layout.addStretch()
         
         # 取消按钮
         cancel_btn = QPushButton("✖ 取消")
         cancel_btn.setObjectName("cancelButton")
-        cancel_btn.setFixedSize(self.scaled(100), self.scaled(40))
+        cancel_btn.setFixedSize(self._scaled[100], self._scaled[40])
         cancel_btn.clicked.connect(self.cancel_dialog)
-        cancel_btn.setAttribute(Qt.WA_Hover, True)
         button_layout.addWidget(cancel_btn)
         
         # 确定按钮
         ok_btn = QPushButton("✓ 确定")
         ok_btn.setObjectName("okButton")
-        ok_btn.setFixedSize(self.scaled(100), self.scaled(40))
+        ok_btn.setFixedSize(self._scaled[100], self._scaled[40])
         ok_btn.setDefault(True)
         ok_btn.clicked.connect(self.submit_answer)
-        ok_btn.setAttribute(Qt.WA_Hover, True)
         button_layout.addWidget(ok_btn)
         
         layout.addWidget(button_frame)
         
     def add_shadow_effect(self):
-        """添加阴影效果"""
-        shadow = QGraphicsDropShadowEffect()
-        shadow.setBlurRadius(self.scaled(25))
-        shadow.setColor(QColor(0, 0, 0, 60))
-        shadow.setOffset(0, self.scaled(8))
-        self.main_container.setGraphicsEffect(shadow)
+        """添加阴影效果。
+
+        不再使用QGraphicsDropShadowEffect（QGraphicsEffect会让整个子树在每次
+        重绘时走软件光栅化），改为在paintEvent里九宫格贴一张预渲染的阴影图。"""
+        self._shadow_margin = self._scaled[12]
+
+    def paintEvent(self, event):
+        """在主容器后面绘制缓存的九宫格阴影"""
+        m = self._shadow_margin
+        if m <= 0:
+            return
+        radius = self._scaled[20]
+        pixmap = _shadow_pixmap(m, radius)
+        edge = m + radius
+        painter = QPainter(self)
+        qDrawBorderPixmap(painter, self.rect(), QMargins(edge, edge, edge, edge), pixmap)
+        painter.end()
         
     def setup_animations(self):
         """设置动画效果"""
-        # 入场动画
-        self.animation = QPropertyAnimation(self, b"geometry")
-        self.animation.setDuration(400)
+        # 入场动画。只动画pos而不是geometry：宽高在动画期间不变，
+        # 动画geometry会让每一帧都触发resizeEvent+整棵子树重新布局，纯移动则没有
+        self.animation = QPropertyAnimation(self, b"pos")
+        # 按屏幕刷新率自适应时长：PyQt没有暴露Qt内部动画定时器的步长设置，
+        # 低刷新率屏幕上缩短动画可减少肉眼可见的跳帧，高刷新率则维持完整时长
+        try:
+            refresh_rate = QApplication.primaryScreen().refreshRate() or 60.0
+        except Exception:
+            refresh_rate = 60.0
+        self.animation.setDuration(400 if refresh_rate >= 50 else 250)
         self.animation.setEasingCurve(QEasingCurve.OutCubic)
-        
-        # 设置初始位置（从屏幕上方滑入）
-        start_rect = QRect(self.x(), -self.height(), self.width(), self.height())
-        end_rect = QRect(self.x(), self.y(), self.width(), self.height())
-        
-        self.animation.setStartValue(start_rect)
-        self.animation.setEndValue(end_rect)
-        
+        # 起止点不在这里冻结：复用的实例每个问题都会被重新定尺寸并居中，
+        # 构造时的坐标会把窗口拉回第一个问题的位置。showEvent按当前几何计算。
+
     def showEvent(self, event):
         """窗口显示时播放动画"""
         super().showEvent(event)
         if self.animation:
+            # 每次显示前按当前几何重算起止点（从屏幕上方滑入到居中位置）
+            self.animation.setStartValue(QPoint(self.x(), -self.height()))
+            self.animation.setEndValue(QPoint(self.x(), self.y()))
             self.animation.start()
             
     def setup_styles(self):
-        """设置现代化样式"""
-        font_size_base = self.scaled(13)
-        font_size_title = self.scaled(18)
-        font_size_content = self.scaled(14)
-        
-        self.setStyleSheet(f"""
-            /* 主容器 */
-            QFrame#mainContainer {{
-                background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
-                    stop:0 #667eea, stop:1 #764ba2);
-                border-radius: {self.scaled(16)}px;
-                border: 1px solid rgba(255, 255, 255, 0.2);
-            }}
-            
-            /* 字体基础设置 */
-            * {{
-                font-family: 'Microsoft YaHei UI', 'Segoe UI', Arial, sans-serif;
-                color: white;
-            }}
-            
-            /* 头部区域 */
-            QFrame#headerFrame {{
-                background: transparent;
-                border: none;
-            }}
-            
-            /* 标题样式 */
-            QLabel#titleLabel {{
-                font-size: {font_size_title}px;
-                font-weight: bold;
-                color: white;
-                background: transparent;
-                padding: {self.scaled(10)}px;
-            }}
-            
-            /* 内容样式 */
-            QLabel#contentLabel {{
-                font-size: {font_size_content}px;
-                color: rgba(255, 255, 255, 0.9);
-                background: transparent;
-                padding: {self.scaled(5)}px;
-            }}
-            
-            /* 错误标签 */
-            QLabel#errorLabel {{
-                color: #ff6b6b;
-                background: rgba(255, 107, 107, 0.1);
-                border: 1px solid rgba(255, 107, 107, 0.3);
-                border-radius: {self.scaled(8)}px;
-                padding: {self.scaled(10)}px;
-                font-size: {font_size_base}px;
-            }}
-            
-            /* 输入框区域 */
-            QFrame#inputFrame {{
-                background: transparent;
-                border: none;
-            }}
-            
-            /* 文本输入框 */
-            QTextEdit#modernTextEdit {{
-                background: rgba(255, 255, 255, 0.95);
-                border: 2px solid rgba(255, 255, 255, 0.3);
-                border-radius: {self.scaled(12)}px;
-                padding: {self.scaled(15)}px;
-                font-size: {font_size_base}px;
-                color: #333;
-                selection-background-color: #667eea;
-            }}
-            
-            QTextEdit#modernTextEdit:focus {{
-                border: 2px solid rgba(255, 255, 255, 0.8);
-                background: rgba(255, 255, 255, 1.0);
-            }}
-            
-            /* 滚动区域 */
-            QScrollArea#modernScrollArea {{
-                background: transparent;
-                border: none;
-            }}
-            
-            QWidget#scrollWidget {{
-                background: transparent;
-            }}
-            
-            /* 选项框架 */
-            QFrame#optionFrame {{
-                background: rgba(255, 255, 255, 0.1);
-                border: 1px solid rgba(255, 255, 255, 0.2);
-                border-radius: {self.scaled(8)}px;
-                margin: {self.scaled(2)}px;
-            }}
-            
-            QFrame#optionFrame:hover {{
-                background: rgba(255, 255, 255, 0.2);
-                border: 1px solid rgba(255, 255, 255, 0.4);
-            }}
-            
-            QFrame#otherFrame {{
-                background: rgba(255, 255, 255, 0.15);
-                border: 1px solid rgba(255, 255, 255, 0.3);
-                border-radius: {self.scaled(8)}px;
-                margin: {self.scaled(2)}px;
-            }}
-            
-            /* 单选按钮 */
-            QRadioButton#modernRadio {{
-                font-size: {font_size_base}px;
-                color: white;
-                background: transparent;
-                padding: {self.scaled(5)}px;
-                spacing: {self.scaled(8)}px;
-            }}
-            
-            QRadioButton#modernRadio::indicator {{
-                width: {self.scaled(16)}px;
-                height: {self.scaled(16)}px;
-            }}
-            
-            QRadioButton#modernRadio::indicator:unchecked {{
-                border: 2px solid rgba(255, 255, 255, 0.6);
-                border-radius: {self.scaled(8)}px;
-                background: transparent;
-            }}
-            
-            QRadioButton#modernRadio::indicator:checked {{
-                border: 2px solid white;
-                border-radius: {self.scaled(8)}px;
-                background: qradialgradient(cx:0.5, cy:0.5, radius:0.5,
-                    fx:0.5, fy:0.5, stop:0 white, stop:0.3 white, 
-                    stop:0.4 transparent, stop:1 transparent);
-            }}
-            
-            /* 自定义输入框（多行文本编辑器） */
-            QTextEdit#modernTextEdit:disabled {{
-                background: rgba(255, 255, 255, 0.3);
-                color: rgba(255, 255, 255, 0.5);
-                border: 2px solid rgba(255, 255, 255, 0.2);
-            }}
-            
-            /* 按钮区域 */
-            QFrame#buttonFrame {{
-                background: transparent;
-                border: none;
-            }}
-            
-            /* 取消按钮 */
-            QPushButton#cancelButton {{
-                background: rgba(255, 255, 255, 0.2);
-                border: 1px solid rgba(255, 255, 255, 0.3);
-                border-radius: {self.scaled(20)}px;
-                color: white;
-                font-size: {font_size_base}px;
-                font-weight: bold;
-            }}
-            
-            QPushButton#cancelButton:hover {{
-                background: rgba(255, 255, 255, 0.3);
-                border: 1px solid rgba(255, 255, 255, 0.5);
-            }}
-            
-            QPushButton#cancelButton:pressed {{
-                background: rgba(255, 255, 255, 0.1);
-            }}
-            
-            /* 确定按钮 */
-            QPushButton#okButton {{
-                background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
-                    stop:0 #4facfe, stop:1 #00f2fe);
-                border: none;
-                border-radius: {self.scaled(20)}px;
-                color: white;
-                font-size: {font_size_base}px;
-                font-weight: bold;
-            }}
-            
-            QPushButton#okButton:hover {{
-                background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
-                    stop:0 #5fbbff, stop:1 #1ff3ff);
-            }}
-            
-            QPushButton#okButton:pressed {{
-                background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
-                    stop:0 #3f9bde, stop:1 #00d2de);
-            }}
-            
-            /* 滚动条样式 */
-            QScrollBar:vertical {{
-                background: rgba(255, 255, 255, 0.1);
-                width: {self.scaled(8)}px;
-                border-radius: {self.scaled(4)}px;
-                margin: 0;
-            }}
-            
-            QScrollBar::handle:vertical {{
-                background: rgba(255, 255, 255, 0.3);
-                border-radius: {self.scaled(4)}px;
-                min-height: {self.scaled(20)}px;
-            }}
-            
-            QScrollBar::handle:vertical:hover {{
-                background: rgba(255, 255, 255, 0.5);
-            }}
-            
-            QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {{
-                height: 0px;
-            }}
-        """)
-        
+        """设置现代化样式。
+
+        静态的颜色/渐变规则整段装在QApplication上，进程内只解析一次；
+        与DPI相关的尺寸规则是一小段，按缩放档位格式化后装在对话框上。
+        Qt的CSS解析器在每个对话框上只需要处理这一小段尺寸规则。"""
+        if not ModernQuestionDialog._static_style_installed:
+            QApplication.instance().setStyleSheet(_STATIC_CSS)
+            ModernQuestionDialog._static_style_installed = True
+        key = round(self.scale_factor * 100)
+        css = ModernQuestionDialog._style_cache.get(key)
+        if css is None:
+            sizes = {f"s{n}": self.scaled(n) for n in (2, 4, 5, 8, 10, 12, 13, 14, 15, 16, 18, 20)}
+            css = _SIZE_TEMPLATE.format(**sizes)
+            ModernQuestionDialog._style_cache[key] = css
+        self.setStyleSheet(css)
+
+    def _ensure_error_label(self):
+        """懒创建错误提示标签：插到标题区域之后，与原固定布局位置一致"""
+        if self.error_label is None:
+            self.error_label = QLabel("")
+            self.error_label.setObjectName("errorLabel")
+            self.error_label.setVisible(False)
+            self._main_layout.insertWidget(1, self.error_label)
+        return self.error_label
+
+    def _ensure_custom_input(self):
+        """懒创建"其他"选项的自定义输入框：首次选中时才构建QTextEdit子树"""
+        if self.custom_input is None:
+            self.custom_input = AutoResizeTextEdit(is_single_line=False)
+            self.custom_input.setObjectName("modernTextEdit")
+            self.custom_input.setPlaceholderText("🖊️ 请输入自定义选项... 📎 支持拖拽或粘贴图片\n支持多行文本，窗口会自动适应内容高度")
+            self.custom_input.textChanged.connect(self.on_custom_changed)
+            self._other_layout.addWidget(self.custom_input)
+        return self.custom_input
+
+    def _set_custom_input_active(self, active):
+        """切换自定义输入框的可用状态。
+        用setReadOnly+动态属性代替setEnabled：setEnabled会触发整个QTextEdit子树的
+        unpolish/polish（重新解析QSS），而动态属性只需polish一次即可套用对应样式规则。"""
+        self.custom_input.setReadOnly(not active)
+        self.custom_input.setProperty("disabled_look", not active)
+        self.custom_input.style().polish(self.custom_input)
+
+    @_safe_event
     def on_custom_toggled(self, checked):
         """处理自定义选项切换"""
-        try:
-            self.custom_input.setEnabled(checked)
-            if checked:
-                self.custom_input.setFocus()
-                # 当启用"其他"选项时，重新调整对话框大小以适应内容
-                QTimer.singleShot(100, self.adjust_size_to_content)
-            else:
-                # 暂时断开信号连接，避免循环触发
-                self.custom_input.textChanged.disconnect()
+        if checked:
+            self._ensure_custom_input()
+            self._set_custom_input_active(True)
+            self.custom_input.setFocus()
+            # 当启用"其他"选项时，重新调整对话框大小以适应内容
+            self._adjust_size_timer.start(100)
+        elif self.custom_input is not None:
+            self._set_custom_input_active(False)
+            # 用QSignalBlocker临时屏蔽信号避免循环触发：
+            # 只翻转一个布尔标记，比disconnect/connect遍历连接表便宜得多
+            with QSignalBlocker(self.custom_input):
                 self.custom_input.clear()
-                # 重新连接信号
-                self.custom_input.textChanged.connect(self.on_custom_changed)
-                # 清空后也重新调整大小
-                QTimer.singleShot(100, self.adjust_size_to_content)
-        except Exception as e:
-            print(f"处理自定义选项切换时出错: {e}")
-            
+            # 清空后也重新调整大小
+            self._adjust_size_timer.start(100)
+
+    @_safe_event
     def on_custom_changed(self):
         """处理自定义输入变化"""
-        try:
-            text = self.custom_input.toPlainText().strip()
-            if text:
-                # 如果有自定义文本，自动选择"其他"选项
-                other_button = self.choice_group.button(len(self.question.options))
-                if other_button and not other_button.isChecked():
-                    # 暂时断开切换信号，避免循环触发
-                    other_button.toggled.disconnect()
-                    other_button.setChecked(True)
-                    # 重新连接信号
-                    other_button.toggled.connect(self.on_custom_toggled)
-        except Exception as e:
-            print(f"处理自定义输入变化时出错: {e}")
+        # 先用C++侧的isEmpty()短路：这个槽每个按键都会触发，
+        # 没必要每次都把整篇文档marshal成Python字符串再strip
+        if self.custom_input.document().isEmpty():
+            return
+        if not self.custom_input.toPlainText().strip():
+            return
+        # 如果有自定义文本，自动选择"其他"选项
+        other_button = self.choice_group.button(len(self.question.options))
+        if other_button and not other_button.isChecked():
+            # 用QSignalBlocker临时屏蔽切换信号，避免循环触发
+            with QSignalBlocker(other_button):
+                other_button.setChecked(True)
+            # 勾选时不会走on_custom_toggled，手动同步输入框状态
+            self._set_custom_input_active(True)
     
+    def _emit_finished(self, result):
+        """发射finished信号（只发射一次，避免close()重入closeEvent导致的重复派发）"""
+        if self._finished_emitted:
+            return
+        self._finished_emitted = True
+        self.finished.emit(result)
+
     def show_error(self, message, duration=3000):
         """显示错误信息"""
-        self.error_label.setText(message)
-        self.error_label.setVisible(True)
-        
-        # 自动隐藏错误信息
-        QTimer.singleShot(duration, lambda: self.error_label.setVisible(False))
+        error_label = self._ensure_error_label()
+        error_label.setText(message)
+        error_label.setVisible(True)
+
+        # 自动隐藏错误信息（复用同一个定时器，重复报错时自动顺延）
+        self._error_hide_timer.start(duration)
+
+    def _hide_error(self):
+        """隐藏错误提示"""
+        if self.error_label is not None:
+            self.error_label.setVisible(False)
         
+    @_safe_event
     def submit_answer(self):
-        """提交答案"""
+        """提交答案。
 
-        try:
-            if self.question.question_type == 'qa':
-                # 问答题 - 支持图片内容
-                content = self.text_input.get_content_with_images()
-                
-                # 检查是否有内容（文本或图片）
-                if isinstance(content, dict):
-                    if not content.get("text", "").strip() and not content.get("images", []):
-                        self.show_error("请输入您的回答或添加图片")
-                        return
-                elif not content.strip():
-                    self.show_error("请输入您的回答")
-                    return
-                    
-                self.result = content
-                
-            elif self.question.question_type == 'choice':
-                # 选择题
-                checked_button = self.choice_group.checkedButton()
-                if not checked_button:
-                    self.show_error("请选择一个选项")
-                    return
-                    
-                button_id = self.choice_group.id(checked_button)
-                
-                if button_id == len(self.question.options):  # "其他"选项
-                    # 支持图片内容的自定义选项
-                    content = self.custom_input.get_content_with_images()
-                    
-                    # 检查是否有内容（文本或图片）
-                    if isinstance(content, dict):
-                        if not content.get("text", "").strip() and not content.get("images", []):
-                            self.show_error("请输入自定义选项内容或添加图片")
-                            return
-                    elif not content.strip():
-                        self.show_error("请输入自定义选项内容")
-                        return
-                        
-                    self.result = content
-                else:
-                    # 预设选项
-                    option = self.question.options[button_id]
-                    self.result = option.value
-            
-            # 标记为已完成
-            self.is_completed = True
-            self.finished.emit(self.result)
-            self.close()
-            
-        except Exception as e:
-            self.show_error(f"提交失败: {str(e)}")
+        校验全部用显式的前置检查完成；收集逻辑按问题类型在构造时绑定到
+        _collect_answer。注意这是个Qt槽，在嵌套事件循环里运行，异常不会
+        传到show_question的try/except——PyQt5 5.5起未捕获的槽异常直接
+        qFatal终止进程，所以仍需_safe_event兜底。"""
+        if not self._collect_answer():
+            return
+
+        # 标记为已完成
+        self.is_completed = True
+        self._emit_finished(self.result)
+        self.close()
+
+    def _collect_qa_answer(self):
+        """收集问答题回答（支持图片内容），校验失败时提示并返回False"""
+        content = self.text_input.get_content_with_images()
+
+        # 检查是否有内容（文本或图片）
+        if _content_is_empty(content):
+            self.show_error("请输入您的回答或添加图片")
+            return False
+
+        self.result = content
+        return True
+
+    def _collect_choice_answer(self):
+        """收集选择题回答，校验失败时提示并返回False"""
+        checked_button = self.choice_group.checkedButton()
+        if not checked_button:
+            self.show_error("请选择一个选项")
+            return False
+
+        button_id = self.choice_group.id(checked_button)
+
+        if button_id == len(self.question.options):  # "其他"选项
+            if self.custom_input is None:
+                self.show_error("请输入自定义选项内容")
+                return False
+            # 支持图片内容的自定义选项
+            content = self.custom_input.get_content_with_images()
+
+            # 检查是否有内容（文本或图片）
+            if _content_is_empty(content):
+                self.show_error("请输入自定义选项内容或添加图片")
+                return False
+
+            self.result = content
+        else:
+            # 预设选项
+            self.result = self.question.options[button_id].value
+        return True
     
     def cancel_dialog(self):
         """取消对话框"""
         self.cancel_reason = "[BUTTON]用户点击了取消按钮"
         self.is_completed = True
         self.result = None
-        self.finished.emit(None)
+        self._emit_finished(None)
         self.close()
         
     def keyPressEvent(self, event):
@@ -1241,7 +1734,7 @@ class ModernQuestionDialog(QWidget):
             self.cancel_reason = "[ESC]用户按了ESC键"
             self.is_completed = True
             self.result = None
-            self.finished.emit(None)
+            self._emit_finished(None)
             self.close()
         elif event.key() == Qt.Key_Return and event.modifiers() == Qt.ControlModifier:
             self.submit_answer()
@@ -1255,17 +1748,24 @@ class ModernQuestionDialog(QWidget):
             self.cancel_reason = "[CLOSE]用户关闭了窗口(点击X按钮或其他方式)"
             self.is_completed = True
             if self.result is None:
-                self.finished.emit(None)
+                self._emit_finished(None)
         event.accept()
             
     def mousePressEvent(self, event):
         """处理鼠标按压事件，实现窗口拖拽"""
         if event.button() == Qt.LeftButton:
+            # 优先走系统原生拖拽（Qt 5.15+）：由合成器直接移动窗口，
+            # 拖拽期间不再为每个像素的鼠标移动回调一次Python
+            window = self.windowHandle()
+            if window is not None and hasattr(window, 'startSystemMove') and window.startSystemMove():
+                event.accept()
+                return
+            # 旧版Qt/不支持的平台回退到手动拖拽
             self.drag_start_position = event.globalPos() - self.frameGeometry().topLeft()
             event.accept()
-            
+
     def mouseMoveEvent(self, event):
-        """处理鼠标移动事件，实现窗口拖拽"""
+        """处理鼠标移动事件，实现窗口拖拽（原生拖拽不可用时的回退路径）"""
         if event.buttons() == Qt.LeftButton and hasattr(self, 'drag_start_position'):
             self.move(event.globalPos() - self.drag_start_position)
             event.accept()
@@ -1273,24 +1773,88 @@ class ModernQuestionDialog(QWidget):
 
 
 
+class DialogStatus(IntEnum):
+    """对话框交互结果状态"""
+    OK = 0
+    CANCELLED = 1
+    ERROR = 2
+
+
+@dataclass
+class DialogResult:
+    """show_question的结构化返回值。
+
+    用枚举+字段代替"CANCELLED:..."/"ERROR:..."字符串协议：
+    调用方直接按status分支，不再做字符串拼接和startswith解析。"""
+    status: DialogStatus
+    payload: Any = None  # OK时为用户回答（字符串或含图片的dict）
+    reason: Optional[str] = None  # 取消/错误时的说明
+
+
 class UIHandler:
     """UI处理器"""
-    
+
+    # 同步和异步路径共享的单线程执行器：QApplication、缓存的对话框实例
+    # 以及它们内部的QTimer都有线程归属，必须始终在同一条常驻线程上创建和复用
+    _executor = None
+    # 执行器的工作线程对象，用于识别"已经在UI线程上"的调用，避免自己submit自己死锁
+    _ui_thread = None
+    # 保护懒初始化：show_question可从任意调用方线程进入，两个并发的首次调用
+    # 若各建一个执行器，就又回到了"两条UI线程、两个QApplication"的老问题
+    _executor_lock = threading.Lock()
+
+    # 进程内共享的QApplication。首次show_question时创建并缓存，
+    # 之后的调用不再走QApplication.instance()查询，也不可能意外建出第二个实例
+    _app = None
+
+    @classmethod
+    def _ensure_app(cls):
+        """获取（必要时创建）共享的QApplication实例"""
+        if cls._app is None:
+            app = QApplication.instance()
+            if app is None:
+                app = QApplication(sys.argv)
+                app.setQuitOnLastWindowClosed(False)
+            cls._app = app
+        return cls._app
+
+    @classmethod
+    def _dialog_executor(cls):
+        """懒创建并复用单worker的ThreadPoolExecutor（加锁的双重检查初始化）"""
+        if cls._executor is None:
+            with cls._executor_lock:
+                if cls._executor is None:
+                    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ask-mcp-ui")
+                    # 记录worker线程对象，show_question靠它判断是否需要跨线程转发；
+                    # 先就位再发布_executor，免锁快路径上读到的总是完整状态
+                    cls._ui_thread = executor.submit(threading.current_thread).result()
+                    cls._executor = executor
+        return cls._executor
+
     @staticmethod
-    def show_question(question: ParsedQuestion) -> Optional[str]:
-        """同步显示问题对话框 - 支持连续调用"""
-        from PyQt5.QtCore import QEventLoop
-        
-        # 获取或创建QApplication实例
-        app = QApplication.instance()
-        if not app:
-            app = QApplication(sys.argv)
-            app.setQuitOnLastWindowClosed(False)
-        
+    def show_question(question: ParsedQuestion) -> DialogResult:
+        """同步显示问题对话框 - 支持连续调用。
+
+        无论调用方处于哪个线程，对话框一律转发到常驻UI线程上显示：
+        缓存的对话框实例和其中的QTimer归属于创建它们的线程，若被别的线程
+        直接show()，Qt会拒绝启动计时器并把事件投递到可能已结束的线程队列，
+        嵌套事件循环从此永久挂起。调用方线程只阻塞等待结果。"""
+        executor = UIHandler._dialog_executor()
+        if threading.current_thread() is UIHandler._ui_thread:
+            return UIHandler._show_question_in_ui_thread(question)
+        return executor.submit(UIHandler._show_question_in_ui_thread, question).result()
+
+    @staticmethod
+    def _show_question_in_ui_thread(question: ParsedQuestion) -> DialogResult:
+        """show_question的实际执行体，只能在常驻UI线程上运行"""
+        # 获取或创建共享的QApplication实例
+        app = UIHandler._ensure_app()
+
         result_container = {"result": None, "dialog": None, "completed": False}
         
         try:
-            dialog = ModernQuestionDialog(question)
+            # 结构相同的问题复用缓存的对话框实例，免去整棵控件树重建
+            dialog = ModernQuestionDialog.acquire(question)
             result_container["dialog"] = dialog
             
             # 使用QEventLoop而不是app.exec()来避免连续调用问题
@@ -1301,7 +1865,9 @@ class UIHandler:
                 result_container["completed"] = True
                 event_loop.quit()  # 退出本地事件循环
             
-            dialog.finished.connect(on_finished)
+            # 用队列连接让quit()在下一轮事件循环执行：避免在信号派发栈内
+            # 同步退出嵌套QEventLoop，连续调用时对话框能先完整收尾
+            dialog.finished.connect(on_finished, Qt.QueuedConnection)
             dialog.show()
             
             # 运行本地事件循环，不影响全局应用程序状态
@@ -1314,45 +1880,54 @@ class UIHandler:
             
             # 检查对话框是否正常完成了交互
             if not completed:
-                return "CANCELLED:[HANDLER]对话框未正常完成交互"
-            
+                return DialogResult(DialogStatus.CANCELLED,
+                                    reason="[HANDLER]对话框未正常完成交互")
+
             # 如果结果为None，检查是否是用户主动取消
             if result is None and dialog_ref:
                 cancel_reason = getattr(dialog_ref, 'cancel_reason', None)
                 if cancel_reason:
-                    return f"CANCELLED:{cancel_reason}"
+                    return DialogResult(DialogStatus.CANCELLED, reason=cancel_reason)
                 else:
                     # 没有取消原因说明可能是程序问题，不应该标记为取消
-                    return "ERROR:[HANDLER]对话框返回None但无取消原因，可能存在程序错误"
+                    return DialogResult(DialogStatus.ERROR,
+                                        reason="[HANDLER]对话框返回None但无取消原因，可能存在程序错误")
             elif result is None:
-                return "ERROR:[HANDLER]UIHandler中result为None且无对话框引用"
-            
-            return result
-            
+                return DialogResult(DialogStatus.ERROR,
+                                    reason="[HANDLER]UIHandler中result为None且无对话框引用")
+
+            return DialogResult(DialogStatus.OK, payload=result)
+
         except Exception as e:
             print(f"显示问题对话框时出错: {e}")
-            return f"ERROR:[EXCEPTION]UIHandler异常: {str(e)}"
+            return DialogResult(DialogStatus.ERROR,
+                                reason=f"[EXCEPTION]UIHandler异常: {str(e)}")
         finally:
-            # 清理对话框
-            if 'dialog' in result_container and result_container["dialog"]:
+            # 对话框留在缓存中复用，这里只断开本次调用的结果回调
+            if result_container["dialog"] is not None:
                 try:
-                    result_container["dialog"].deleteLater()
-                except:
+                    result_container["dialog"].finished.disconnect(on_finished)
+                except Exception:
                     pass
     
-    @staticmethod  
-    async def show_question_async(question: ParsedQuestion) -> Optional[str]:
+    @staticmethod
+    def show_question_legacy(question: ParsedQuestion) -> Optional[str]:
+        """兼容旧字符串协议的包装：仅在最外层边界把结构化结果还原成字符串"""
+        result = UIHandler.show_question(question)
+        if result.status is DialogStatus.CANCELLED:
+            return f"CANCELLED:{result.reason}"
+        if result.status is DialogStatus.ERROR:
+            return f"ERROR:{result.reason}"
+        return result.payload
+
+    @staticmethod
+    async def show_question_async(question: ParsedQuestion) -> DialogResult:
         """异步显示问题对话框"""
-        import asyncio
-        from concurrent.futures import ThreadPoolExecutor
-        
         def run_dialog():
             return UIHandler.show_question(question)
-        
-        with ThreadPoolExecutor() as executor:
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(executor, run_dialog)
-            return result
+
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(UIHandler._dialog_executor(), run_dialog)
 
 
 # 保持向后兼容